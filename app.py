@@ -1,211 +1,255 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
+from sqlalchemy import text
+from insights import INSIGHT_QUERIES
+from leaderboard import (
+    BOARDS, WINDOW_LABELS, add_claim, delete_claim, leaderboard_as_of, leaderboards_exist, provider_removed,
+    rebuild_leaderboards, top_k, update_claim_status,
+)
+from replicas import ReplicaManager
+from storage import InsightRefresher, PinnedReader, get_engine, sqlite_path
 
 # =========================
 # DATABASE CONNECTION
 # =========================
-DB_PATH = "Food Wastage.db"
-
-def run_query(query, params=()):
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql(query, conn, params=params)
-
-def execute_query(query, params=()):
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute(query, params)
-        conn.commit()
+# Set FOOD_WASTAGE_DB_URL to point at PostgreSQL; defaults to "Food Wastage.db"
+engine = get_engine()
+REPLICA_INTERVAL_SECONDS = 30
+INSIGHT_REFRESH_SECONDS = 30
+CLAIM_STATUSES = ["Pending", "Completed", "Cancelled"]
+
+@st.cache_resource
+def get_replica_manager():
+    manager = ReplicaManager(sqlite_path(engine))
+    manager.start(interval_seconds=REPLICA_INTERVAL_SECONDS)
+    return manager
+
+@st.cache_resource
+def get_insight_refresher():
+    refresher = InsightRefresher(engine, INSIGHT_QUERIES)
+    refresher.refresh()
+    refresher.start(interval_seconds=INSIGHT_REFRESH_SECONDS)
+    return refresher
+
+@st.cache_resource
+def prepare_leaderboards():
+    with engine.connect() as conn:
+        ready = leaderboards_exist(conn)
+    if not ready:
+        rebuild_leaderboards(engine)
+        if replica_manager:
+            replica_manager.publish()
+    return True
+
+# PostgreSQL readers pin a REPEATABLE READ transaction instead of a snapshot
+if sqlite_path(engine):
+    replica_manager = get_replica_manager()
+    insight_refresher = None
+else:
+    replica_manager = None
+    insight_refresher = get_insight_refresher()
+prepare_leaderboards()
+
+def run_query(query, params=None):
+    return reader.read_sql(query, params)
+
+def run_insight(title, query, params=None):
+    return reader.read_insight(title, query, params)
+
+def run_leaderboard(board, window, k, city=None):
+    return top_k(reader.conn, board, window, k, city or None)
+
+def run_write(write):
+    with engine.begin() as conn:
+        result = write(conn)
+    # Snapshots and insight views are rebuilt by background threads, off the request path
+    (replica_manager or insight_refresher).mark_stale()
+    return result
+
+def execute_query(query, params=None):
+    run_write(lambda conn: conn.execute(text(query), params or {}))
 
 def get_table_columns(table_name):
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        return [row[1] for row in cursor.fetchall()]
-
-# =========================
-# APP TITLE
-# =========================
-st.set_page_config(page_title="Food Wastage Insights Dashboard", layout="wide")
-st.title("🍽 Food Wastage Insights Dashboard")
-
-# =========================
-# FILTERS
-# =========================
-st.sidebar.header("🔍 Filters")
-location_filter = st.sidebar.text_input("Filter by City")
-provider_filter = st.sidebar.text_input("Filter by Provider Name")
-food_type_filter = st.sidebar.text_input("Filter by Food Type")
-provider_type_filter = st.sidebar.text_input("Filter by Provider Type")
-
-# Check provider table columns
-provider_columns = get_table_columns("providers")
-
-# =========================
-# SQL QUERIES
-# =========================
-queries = {
-    "Providers & Receivers by City": '''
-        SELECT p.City,
-               COUNT(DISTINCT p.Provider_ID) AS Providers,
-               COUNT(DISTINCT r.Receiver_ID) AS Receivers
-        FROM providers p
-        LEFT JOIN receivers r ON p.City = r.City
-        GROUP BY p.City;
-    ''',
-    "Top Food Provider Type": '''
-        SELECT Provider_Type, SUM(Quantity) AS Total_Food
-        FROM providers p
-        JOIN food_listings f ON p.Provider_ID = f.Provider_ID
-        GROUP BY Provider_Type
-        ORDER BY Total_Food DESC;
-    ''' if "Provider_Type" in provider_columns else None,
-    "Provider Contact by City": '''
-        SELECT Name, Contact, City
-        FROM providers
-        WHERE City LIKE ?;
-    ''',
-    "Top Receivers by Claims": '''
-        SELECT r.Name, COUNT(c.Claim_ID) AS Total_Claims
-        FROM receivers r
-        JOIN claims c ON r.Receiver_ID = c.Receiver_ID
-        GROUP BY r.Name
-        ORDER BY Total_Claims DESC;
-    ''',
-    "Total Quantity Available": '''
-        SELECT SUM(Quantity) AS Total_Available
-        FROM food_listings;
-    ''',
-    "City with Most Listings": '''
-        SELECT Location, COUNT(*) AS Listing_Count
-        FROM food_listings
-        GROUP BY Location
-        ORDER BY Listing_Count DESC
-        LIMIT 1;
-    ''',
-    "Most Common Food Types": '''
-        SELECT Food_Type, COUNT(*) AS Count
-        FROM food_listings
-        GROUP BY Food_Type
-        ORDER BY Count DESC;
-    ''',
-    "Claims per Food Item": '''
-        SELECT f.Food_Type, COUNT(c.Claim_ID) AS Claims
-        FROM claims c
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY f.Food_Type;
-    ''',
-    "Provider with Most Successful Claims": '''
-        SELECT p.Name, COUNT(c.Claim_ID) AS Successful_Claims
-        FROM providers p
-        JOIN food_listings f ON p.Provider_ID = f.Provider_ID
-        JOIN claims c ON f.Food_ID = c.Food_ID
-        WHERE c.Status = 'Completed'
-        GROUP BY p.Name
-        ORDER BY Successful_Claims DESC
-        LIMIT 1;
-    ''',
-    "Claim Status Percentages": '''
-        SELECT Status,
-               ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims)), 2) AS Percentage
-        FROM claims
-        GROUP BY Status;
-    ''',
-    "Avg Quantity Claimed per Receiver": '''
-        SELECT r.Name, ROUND(AVG(f.Quantity), 2) AS Avg_Quantity
-        FROM receivers r
-        JOIN claims c ON r.Receiver_ID = c.Receiver_ID
-        JOIN food_listings f ON c.Food_ID = f.Food_ID
-        GROUP BY r.Name;
-    ''',
-    "Most Claimed Meal Type": '''
-        SELECT Meal_Type, COUNT(*) AS Claims
-        FROM food_listings f
-        JOIN claims c ON f.Food_ID = c.Food_ID
-        GROUP BY Meal_Type
-        ORDER BY Claims DESC
-        LIMIT 1;
-    ''',
-    "Total Quantity by Provider": '''
-        SELECT p.Name, SUM(f.Quantity) AS Total_Donated
-        FROM providers p
-        JOIN food_listings f ON p.Provider_ID = f.Provider_ID
-        GROUP BY p.Name;
-    '''
-}
-
-# =========================
-# DISPLAY RESULTS
-# =========================
-st.header("📊 SQL Insights")
-
-for title, sql in queries.items():
-    if sql:
-        st.subheader(title)
-        if "Provider Contact by City" in title:
-            df = run_query(sql, (f"%{location_filter}%",))
-        else:
-            df = run_query(sql)
-        st.dataframe(df)
-
-# =========================
-# PROVIDER CONTACT DETAILS
-# =========================
-st.header("📞 Contact Food Providers Directly")
-
-contact_query = "SELECT Name, City, Contact" + (", Provider_Type" if "Provider_Type" in provider_columns else "") + " FROM providers WHERE 1=1"
-params = []
-
-if location_filter:
-    contact_query += " AND City LIKE ?"
-    params.append(f"%{location_filter}%")
-if provider_type_filter and "Provider_Type" in provider_columns:
-    contact_query += " AND Provider_Type LIKE ?"
-    params.append(f"%{provider_type_filter}%")
-if provider_filter:
-    contact_query += " AND Name LIKE ?"
-    params.append(f"%{provider_filter}%")
-
-contact_df = run_query(contact_query, tuple(params))
-st.dataframe(contact_df)
-
-# =========================
-# CRUD OPERATIONS
-# =========================
-st.header("🛠 Manage Records")
-
-crud_action = st.selectbox("Select Action", ["Add Provider", "Update Provider", "Delete Provider"])
-
-if crud_action == "Add Provider":
-    name = st.text_input("Name")
-    city = st.text_input("City")
-    contact = st.text_input("Contact")
-    provider_type = st.text_input("Provider Type") if "Provider_Type" in provider_columns else None
-    if st.button("Add"):
-        if "Provider_Type" in provider_columns:
-            execute_query(
-                "INSERT INTO providers (Name, City, Provider_Type, Contact) VALUES (?, ?, ?, ?)",
-                (name, city, provider_type, contact)
-            )
-        else:
+    return reader.table_columns(table_name)
+
+# Pin one consistent view for the whole render so every panel sees the same data
+reader = PinnedReader(engine, replica_manager)
+try:
+    # =========================
+    # APP TITLE
+    # =========================
+    st.set_page_config(page_title="Food Wastage Insights Dashboard", layout="wide")
+    st.title("🍽 Food Wastage Insights Dashboard")
+
+    # =========================
+    # FILTERS
+    # =========================
+    st.sidebar.header("🔍 Filters")
+    location_filter = st.sidebar.text_input("Filter by City")
+    provider_filter = st.sidebar.text_input("Filter by Provider Name")
+    food_type_filter = st.sidebar.text_input("Filter by Food Type")
+    provider_type_filter = st.sidebar.text_input("Filter by Provider Type")
+
+    # =========================
+    # REPLICA STATUS
+    # =========================
+    if replica_manager:
+        st.sidebar.header("🗄 Data Snapshot")
+        replica_metrics = replica_manager.metrics()
+        st.sidebar.metric("Replica Lag (s)", replica_metrics["Replica_Lag_Seconds"])
+        st.sidebar.caption(f"Snapshot version {reader.snapshot.version} · {replica_metrics['Snapshots']} retained")
+
+    # Check provider table columns
+    provider_columns = get_table_columns("providers")
+
+    # =========================
+    # SQL QUERIES
+    # =========================
+    queries = dict(INSIGHT_QUERIES)
+    if "Provider_Type" not in provider_columns:
+        queries["Top Food Provider Type"] = None
+
+    # =========================
+    # DISPLAY RESULTS
+    # =========================
+    st.header("📊 SQL Insights")
+
+    for title, sql in queries.items():
+        if sql:
+            st.subheader(title)
+            if "Provider Contact by City" in title:
+                df = run_insight(title, sql, {"city": f"%{location_filter}%"})
+            else:
+                df = run_insight(title, sql)
+            st.dataframe(df)
+
+    # =========================
+    # LEADERBOARDS
+    # =========================
+    st.header("🏆 Leaderboards")
+
+    board_titles = {config["title"]: board for board, config in BOARDS.items()}
+    board = board_titles[st.selectbox("Leaderboard", list(board_titles))]
+    window = st.radio("Time Window", BOARDS[board]["windows"], format_func=WINDOW_LABELS.get, horizontal=True)
+    top_n = st.slider("Top K", min_value=5, max_value=50, value=10)
+    st.dataframe(run_leaderboard(board, window, top_n, location_filter.strip()))
+    if window != "all":
+        st.caption(f"Windows end at the latest claim day ({leaderboard_as_of(reader.conn)}), not today.")
+    if location_filter:
+        st.caption("Leaderboards match the city filter exactly.")
+
+    # =========================
+    # CLAIM DEMAND FORECAST
+    # =========================
+    st.header("📈 Claim Demand Forecast")
+
+    forecast_columns = get_table_columns("claim_forecasts")
+    if forecast_columns:
+        forecast_query = "SELECT Location, Food_Type, Meal_Type, Forecast_Date, Forecast_Claims FROM claim_forecasts WHERE 1=1"
+        params = {}
+        if location_filter:
+            forecast_query += " AND Location LIKE :location"
+            params["location"] = f"%{location_filter}%"
+        if food_type_filter:
+            forecast_query += " AND Food_Type LIKE :food_type"
+            params["food_type"] = f"%{food_type_filter}%"
+        forecast_query += " ORDER BY Forecast_Date, Forecast_Claims DESC"
+        st.dataframe(run_query(forecast_query, params))
+    else:
+        st.info("No forecasts yet - run the demand forecasting step to populate 'claim_forecasts'.")
+
+    # =========================
+    # PROVIDER CONTACT DETAILS
+    # =========================
+    st.header("📞 Contact Food Providers Directly")
+
+    contact_query = "SELECT Name, City, Contact" + (", Provider_Type" if "Provider_Type" in provider_columns else "") + " FROM providers WHERE 1=1"
+    params = {}
+
+    if location_filter:
+        contact_query += " AND City LIKE :city"
+        params["city"] = f"%{location_filter}%"
+    if provider_type_filter and "Provider_Type" in provider_columns:
+        contact_query += " AND Provider_Type LIKE :provider_type"
+        params["provider_type"] = f"%{provider_type_filter}%"
+    if provider_filter:
+        contact_query += " AND Name LIKE :name"
+        params["name"] = f"%{provider_filter}%"
+
+    contact_df = run_query(contact_query, params)
+    st.dataframe(contact_df)
+
+    # =========================
+    # CRUD OPERATIONS
+    # =========================
+    st.header("🛠 Manage Records")
+
+    crud_action = st.selectbox("Select Action", [
+        "Add Provider", "Update Provider", "Delete Provider", "Add Claim", "Update Claim Status", "Delete Claim"
+    ])
+
+    if crud_action == "Add Provider":
+        name = st.text_input("Name")
+        city = st.text_input("City")
+        contact = st.text_input("Contact")
+        provider_type = st.text_input("Provider Type") if "Provider_Type" in provider_columns else None
+        if st.button("Add"):
+            if "Provider_Type" in provider_columns:
+                execute_query(
+                    "INSERT INTO providers (Name, City, Provider_Type, Contact) VALUES (:name, :city, :ptype, :contact)",
+                    {"name": name, "city": city, "ptype": provider_type, "contact": contact}
+                )
+            else:
+                execute_query(
+                    "INSERT INTO providers (Name, City, Contact) VALUES (:name, :city, :contact)",
+                    {"name": name, "city": city, "contact": contact}
+                )
+            st.success("Provider added successfully!")
+
+    elif crud_action == "Update Provider":
+        provider_id = st.number_input("Provider ID", step=1)
+        contact = st.text_input("New Contact")
+        if st.button("Update"):
             execute_query(
-                "INSERT INTO providers (Name, City, Contact) VALUES (?, ?, ?)",
-                (name, city, contact)
+                "UPDATE providers SET Contact = :contact WHERE Provider_ID = :pid",
+                {"contact": contact, "pid": provider_id}
             )
-        st.success("Provider added successfully!")
-
-elif crud_action == "Update Provider":
-    provider_id = st.number_input("Provider ID", step=1)
-    contact = st.text_input("New Contact")
-    if st.button("Update"):
-        execute_query(
-            "UPDATE providers SET Contact = ? WHERE Provider_ID = ?",
-            (contact, provider_id)
-        )
-        st.success("Provider updated successfully!")
-
-elif crud_action == "Delete Provider":
-    provider_id = st.number_input("Provider ID", step=1)
-    if st.button("Delete"):
-        execute_query("DELETE FROM providers WHERE Provider_ID = ?", (provider_id,))
-        st.success("Provider deleted successfully!")
+            st.success("Provider updated successfully!")
+
+    elif crud_action == "Delete Provider":
+        provider_id = st.number_input("Provider ID", step=1)
+        if st.button("Delete"):
+            def delete_provider(conn):
+                conn.execute(text("DELETE FROM providers WHERE Provider_ID = :pid"), {"pid": provider_id})
+                provider_removed(conn, provider_id)
+            run_write(delete_provider)
+            st.success("Provider deleted successfully!")
+
+    elif crud_action == "Add Claim":
+        food_id = st.number_input("Food ID", step=1)
+        receiver_id = st.number_input("Receiver ID", step=1)
+        status = st.selectbox("Status", CLAIM_STATUSES)
+        if st.button("Add"):
+            try:
+                run_write(lambda conn: add_claim(conn, int(food_id), int(receiver_id), status))
+                st.success("Claim added successfully!")
+            except ValueError as e:
+                st.error(str(e))
+
+    elif crud_action == "Update Claim Status":
+        claim_id = st.number_input("Claim ID", step=1)
+        status = st.selectbox("New Status", CLAIM_STATUSES)
+        if st.button("Update"):
+            if run_write(lambda conn: update_claim_status(conn, int(claim_id), status)):
+                st.success("Claim updated successfully!")
+            else:
+                st.error(f"Claim ID {int(claim_id)} does not exist")
+
+    elif crud_action == "Delete Claim":
+        claim_id = st.number_input("Claim ID", step=1)
+        if st.button("Delete"):
+            if run_write(lambda conn: delete_claim(conn, int(claim_id))):
+                st.success("Claim deleted successfully!")
+            else:
+                st.error(f"Claim ID {int(claim_id)} does not exist")
+finally:
+    reader.close()
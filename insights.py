@@ -0,0 +1,72 @@
+# PROJECT NAME - Local Food Wastage Management System.
+# MODULE - Dashboard Insight Queries
+
+# Shared by the dashboard and the benchmark. Parameterless queries are
+# served from materialized views on PostgreSQL (see storage.refresh_insights).
+# Rankings by provider/receiver are served by leaderboard.py instead.
+INSIGHT_QUERIES = {
+    "Providers & Receivers by City": '''
+        SELECT p.City,
+               COUNT(DISTINCT p.Provider_ID) AS Providers,
+               COUNT(DISTINCT r.Receiver_ID) AS Receivers
+        FROM providers p
+        LEFT JOIN receivers r ON p.City = r.City
+        GROUP BY p.City;
+    ''',
+    "Top Food Provider Type": '''
+        SELECT Provider_Type, SUM(Quantity) AS Total_Food
+        FROM providers p
+        JOIN food_listings f ON p.Provider_ID = f.Provider_ID
+        GROUP BY Provider_Type
+        ORDER BY Total_Food DESC;
+    ''',
+    "Provider Contact by City": '''
+        SELECT Name, Contact, City
+        FROM providers
+        WHERE City LIKE :city;
+    ''',
+    "Total Quantity Available": '''
+        SELECT SUM(Quantity) AS Total_Available
+        FROM food_listings;
+    ''',
+    "City with Most Listings": '''
+        SELECT Location, COUNT(*) AS Listing_Count
+        FROM food_listings
+        GROUP BY Location
+        ORDER BY Listing_Count DESC
+        LIMIT 1;
+    ''',
+    "Most Common Food Types": '''
+        SELECT Food_Type, COUNT(*) AS Count
+        FROM food_listings
+        GROUP BY Food_Type
+        ORDER BY Count DESC;
+    ''',
+    "Claims per Food Item": '''
+        SELECT f.Food_Type, COUNT(c.Claim_ID) AS Claims
+        FROM claims c
+        JOIN food_listings f ON c.Food_ID = f.Food_ID
+        GROUP BY f.Food_Type;
+    ''',
+    "Claim Status Percentages": '''
+        SELECT Status,
+               ROUND((COUNT(*) * 100.0 / (SELECT COUNT(*) FROM claims)), 2) AS Percentage
+        FROM claims
+        GROUP BY Status;
+    ''',
+    "Avg Quantity Claimed per Receiver": '''
+        SELECT r.Name, ROUND(AVG(f.Quantity), 2) AS Avg_Quantity
+        FROM receivers r
+        JOIN claims c ON r.Receiver_ID = c.Receiver_ID
+        JOIN food_listings f ON c.Food_ID = f.Food_ID
+        GROUP BY r.Name;
+    ''',
+    "Most Claimed Meal Type": '''
+        SELECT Meal_Type, COUNT(*) AS Claims
+        FROM food_listings f
+        JOIN claims c ON f.Food_ID = c.Food_ID
+        GROUP BY Meal_Type
+        ORDER BY Claims DESC
+        LIMIT 1;
+    '''
+}
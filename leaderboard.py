@@ -0,0 +1,312 @@
+# PROJECT NAME - Local Food Wastage Management System.
+# MODULE - Provider / Receiver Leaderboards
+
+from datetime import datetime, timedelta
+import pandas as pd
+from sqlalchemy import text
+from storage import bulk_load, fetch_row, read_sql, table_columns
+
+BOARDS = {
+    "receiver_claims": {"title": "Top Receivers by Claims", "windows": ["all", "7d", "30d"]},
+    "provider_completed_claims": {"title": "Providers with Most Successful Claims", "windows": ["all", "7d", "30d"]},
+    "provider_quantity": {"title": "Total Quantity by Provider", "windows": ["all"]},
+}
+WINDOW_DAYS = {"all": None, "7d": 7, "30d": 30}
+# Windows end at the latest claim day, not today (see rebuild_leaderboards)
+WINDOW_LABELS = {"all": "All time", "7d": "7 days to latest claim", "30d": "30 days to latest claim"}
+CLAIM_BOARDS = ["receiver_claims", "provider_completed_claims"]
+
+# Scores are kept per (board, window, entity) and indexed by score, so the
+# top K is an index range scan. Claim boards also keep per-day buckets so
+# the 7d/30d windows can slide forward by subtracting the days that expire.
+SCHEMA = [
+    """CREATE TABLE leaderboard (
+        Board VARCHAR(40), Time_Window VARCHAR(8), Entity_ID BIGINT,
+        Name TEXT, City TEXT, Score DOUBLE PRECISION
+    )""",
+    "CREATE UNIQUE INDEX ux_leaderboard_entity ON leaderboard (Board, Time_Window, Entity_ID)",
+    "CREATE INDEX ix_leaderboard_score ON leaderboard (Board, Time_Window, Score DESC, Entity_ID)",
+    "CREATE INDEX ix_leaderboard_city_score ON leaderboard (Board, Time_Window, City, Score DESC, Entity_ID)",
+    """CREATE TABLE leaderboard_daily (
+        Board VARCHAR(40), Entity_ID BIGINT, Claim_Day VARCHAR(10), Score DOUBLE PRECISION
+    )""",
+    "CREATE UNIQUE INDEX ux_leaderboard_daily ON leaderboard_daily (Board, Entity_ID, Claim_Day)",
+    "CREATE INDEX ix_leaderboard_daily_day ON leaderboard_daily (Claim_Day)",
+    "CREATE TABLE leaderboard_meta (As_Of VARCHAR(10))",
+]
+LOOKUP_INDEXES = {
+    "providers": "Provider_ID",
+    "receivers": "Receiver_ID",
+    "food_listings": "Food_ID",
+}
+# Backstop for add_claim's MAX(Claim_ID) + 1: a duplicate ID fails instead of being stored
+CLAIM_ID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS ux_claims_claim_id ON claims (Claim_ID)"
+CLAIM_WRITE_ATTEMPTS = 5
+
+def to_day(timestamp):
+    """Calendar day of a timestamp as YYYY-MM-DD."""
+    return pd.Timestamp(timestamp).strftime("%Y-%m-%d")
+
+def window_start(as_of, days):
+    """Last day that is already outside a `days`-long window ending at `as_of`."""
+    return (datetime.strptime(as_of, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+
+# =========================
+# FULL REBUILD
+# =========================
+def rebuild_leaderboards(engine):
+    """Recompute every leaderboard from the base tables.
+
+    Windows are anchored at the most recent claim day rather than today, so
+    the 7d/30d boards stay meaningful on historical data; they move forward
+    only when a newer claim arrives.
+    """
+    with engine.begin() as conn:
+        for table in ["leaderboard", "leaderboard_daily", "leaderboard_meta"]:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+        # ID lookups used by the incremental updates
+        for table, column in LOOKUP_INDEXES.items():
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_{column.lower()} ON {table} ({column})"))
+        conn.execute(text(CLAIM_ID_INDEX))
+
+        claims_df = read_sql(conn, """
+            SELECT c.Receiver_ID, c.Status, c.Timestamp, f.Provider_ID
+            FROM claims c
+            LEFT JOIN food_listings f ON c.Food_ID = f.Food_ID
+        """)
+        listings_df = read_sql(conn, "SELECT Provider_ID, Quantity FROM food_listings")
+        providers_df = read_sql(conn, "SELECT Provider_ID, Name, City FROM providers").drop_duplicates("Provider_ID")
+        receivers_df = read_sql(conn, "SELECT Receiver_ID, Name, City FROM receivers").drop_duplicates("Receiver_ID")
+
+    claims_df["Claim_Day"] = pd.to_datetime(claims_df["Timestamp"], errors="coerce").dt.strftime("%Y-%m-%d")
+    claims_df = claims_df.dropna(subset=["Claim_Day"])
+    completed_df = claims_df[(claims_df["Status"] == "Completed") & claims_df["Provider_ID"].notna()]
+    daily = pd.concat([
+        claims_df.groupby(["Receiver_ID", "Claim_Day"]).size().rename("Score").reset_index()
+            .rename(columns={"Receiver_ID": "Entity_ID"}).assign(Board="receiver_claims"),
+        completed_df.groupby(["Provider_ID", "Claim_Day"]).size().rename("Score").reset_index()
+            .rename(columns={"Provider_ID": "Entity_ID"}).assign(Board="provider_completed_claims"),
+    ], ignore_index=True)
+    daily["Entity_ID"] = daily["Entity_ID"].astype("int64")
+    daily["Score"] = daily["Score"].astype(float)
+    as_of = daily["Claim_Day"].max() if len(daily) else None
+
+    entities = {
+        "receiver_claims": receivers_df.rename(columns={"Receiver_ID": "Entity_ID"}),
+        "provider_completed_claims": providers_df.rename(columns={"Provider_ID": "Entity_ID"}),
+        "provider_quantity": providers_df.rename(columns={"Provider_ID": "Entity_ID"}),
+    }
+    scores = []
+    for board in CLAIM_BOARDS:
+        board_daily = daily[daily["Board"] == board]
+        for window in BOARDS[board]["windows"]:
+            days = WINDOW_DAYS[window]
+            in_window = board_daily
+            if days is not None and as_of is not None:
+                in_window = board_daily[board_daily["Claim_Day"] > window_start(as_of, days)]
+            totals = in_window.groupby("Entity_ID")["Score"].sum().reset_index()
+            scores.append(totals.assign(Board=board, Time_Window=window).merge(entities[board], on="Entity_ID"))
+    quantity = listings_df.groupby("Provider_ID")["Quantity"].sum().astype(float).rename("Score")
+    totals = quantity.rename_axis("Entity_ID").reset_index()
+    scores.append(totals.assign(Board="provider_quantity", Time_Window="all").merge(entities["provider_quantity"], on="Entity_ID"))
+    # The inner joins above drop scores of IDs missing from providers/receivers
+    leaderboard_df = pd.concat(scores, ignore_index=True)[["Board", "Time_Window", "Entity_ID", "Name", "City", "Score"]]
+
+    bulk_load(engine, leaderboard_df, "leaderboard")
+    bulk_load(engine, daily[["Board", "Entity_ID", "Claim_Day", "Score"]], "leaderboard_daily")
+    bulk_load(engine, pd.DataFrame({"As_Of": [as_of]}), "leaderboard_meta")
+    return len(leaderboard_df)
+
+def leaderboards_exist(conn):
+    """True once rebuild_leaderboards has created the leaderboard tables."""
+    return bool(table_columns(conn, "leaderboard_meta"))
+
+def leaderboard_as_of(conn):
+    """Day the 7d/30d windows end on (YYYY-MM-DD), or None before any claims."""
+    meta = fetch_row(conn, "SELECT As_Of FROM leaderboard_meta")
+    return meta["As_Of"] if meta else None
+
+# =========================
+# INCREMENTAL UPDATES
+# =========================
+def slide_windows(conn, new_as_of):
+    """Move the window anchor forward, subtracting the days that drop out."""
+    meta = fetch_row(conn, "SELECT As_Of FROM leaderboard_meta")
+    old_as_of = meta["As_Of"] if meta else None
+    if old_as_of is not None and new_as_of <= old_as_of:
+        return old_as_of
+    if old_as_of is not None:
+        for board in CLAIM_BOARDS:
+            for window in BOARDS[board]["windows"]:
+                days = WINDOW_DAYS[window]
+                if days is None:
+                    continue
+                params = {"board": board, "window": window,
+                          "lo": window_start(old_as_of, days), "hi": window_start(new_as_of, days)}
+                conn.execute(text("""
+                    UPDATE leaderboard
+                    SET Score = Score - (
+                        SELECT SUM(d.Score) FROM leaderboard_daily d
+                        WHERE d.Board = :board AND d.Entity_ID = leaderboard.Entity_ID
+                          AND d.Claim_Day > :lo AND d.Claim_Day <= :hi
+                    )
+                    WHERE Board = :board AND Time_Window = :window
+                      AND Entity_ID IN (
+                        SELECT d.Entity_ID FROM leaderboard_daily d
+                        WHERE d.Board = :board AND d.Claim_Day > :lo AND d.Claim_Day <= :hi
+                      )
+                """), params)
+                conn.execute(text("DELETE FROM leaderboard WHERE Board = :board AND Time_Window = :window AND Score <= 0"),
+                             params)
+        # Buckets older than the longest window are no longer needed
+        longest = max(days for days in WINDOW_DAYS.values() if days)
+        conn.execute(text("DELETE FROM leaderboard_daily WHERE Claim_Day <= :cutoff"),
+                     {"cutoff": window_start(new_as_of, longest)})
+    conn.execute(text("DELETE FROM leaderboard_meta"))
+    conn.execute(text("INSERT INTO leaderboard_meta (As_Of) VALUES (:as_of)"), {"as_of": new_as_of})
+    return new_as_of
+
+def add_score(conn, board, entity, delta, day=None):
+    """Apply `delta` to an entity's score in every window that contains `day`.
+
+    `entity` is a dict with Entity_ID, Name and City. `day` is None for
+    boards that only have an all-time window.
+    """
+    windows = BOARDS[board]["windows"]
+    if day is not None:
+        as_of = slide_windows(conn, day)
+        windows = [w for w in windows if WINDOW_DAYS[w] is None or day > window_start(as_of, WINDOW_DAYS[w])]
+        longest = max(days for days in WINDOW_DAYS.values() if days)
+        if day > window_start(as_of, longest):
+            conn.execute(text("""
+                INSERT INTO leaderboard_daily (Board, Entity_ID, Claim_Day, Score)
+                VALUES (:board, :entity_id, :day, :delta)
+                ON CONFLICT (Board, Entity_ID, Claim_Day) DO UPDATE SET Score = leaderboard_daily.Score + excluded.Score
+            """), {"board": board, "entity_id": entity["Entity_ID"], "day": day, "delta": delta})
+    for window in windows:
+        conn.execute(text("""
+            INSERT INTO leaderboard (Board, Time_Window, Entity_ID, Name, City, Score)
+            VALUES (:board, :window, :entity_id, :name, :city, :delta)
+            ON CONFLICT (Board, Time_Window, Entity_ID) DO UPDATE SET Score = leaderboard.Score + excluded.Score
+        """), {"board": board, "window": window, "entity_id": entity["Entity_ID"],
+               "name": entity["Name"], "city": entity["City"], "delta": delta})
+
+def claim_changed(conn, old=None, new=None):
+    """Update the claim leaderboards for an inserted, updated or deleted claim."""
+    for claim, delta in [(old, -1.0), (new, 1.0)]:
+        if claim is None:
+            continue
+        day = to_day(claim["Timestamp"])
+        receiver = fetch_row(conn, """
+            SELECT Receiver_ID AS Entity_ID, Name, City FROM receivers WHERE Receiver_ID = :rid
+        """, {"rid": claim["Receiver_ID"]})
+        if receiver:
+            add_score(conn, "receiver_claims", receiver, delta, day)
+        if claim["Status"] == "Completed":
+            provider = fetch_row(conn, """
+                SELECT p.Provider_ID AS Entity_ID, p.Name, p.City
+                FROM food_listings f
+                JOIN providers p ON p.Provider_ID = f.Provider_ID
+                WHERE f.Food_ID = :fid
+            """, {"fid": claim["Food_ID"]})
+            if provider:
+                add_score(conn, "provider_completed_claims", provider, delta, day)
+
+def listing_changed(conn, old=None, new=None):
+    """Update the quantity leaderboard for an inserted, updated or deleted listing."""
+    for listing, sign in [(old, -1.0), (new, 1.0)]:
+        if listing is None:
+            continue
+        provider = fetch_row(conn, """
+            SELECT Provider_ID AS Entity_ID, Name, City FROM providers WHERE Provider_ID = :pid
+        """, {"pid": listing["Provider_ID"]})
+        if provider:
+            add_score(conn, "provider_quantity", provider, sign * float(listing["Quantity"]))
+
+def provider_removed(conn, provider_id):
+    """Drop a deleted provider from the provider leaderboards."""
+    conn.execute(text("""
+        DELETE FROM leaderboard WHERE Entity_ID = :pid AND Board IN ('provider_completed_claims', 'provider_quantity')
+    """), {"pid": provider_id})
+
+# =========================
+# CLAIM CRUD
+# =========================
+def add_claim(conn, food_id, receiver_id, status, timestamp=None):
+    """Insert a claim and count it on the leaderboards.
+
+    Raises ValueError if the food listing or receiver does not exist, so the
+    dashboard can't create the orphan claims validation quarantines.
+    """
+    if fetch_row(conn, "SELECT Food_ID FROM food_listings WHERE Food_ID = :fid", {"fid": food_id}) is None:
+        raise ValueError(f"Food ID {food_id} does not exist")
+    if fetch_row(conn, "SELECT Receiver_ID FROM receivers WHERE Receiver_ID = :rid", {"rid": receiver_id}) is None:
+        raise ValueError(f"Receiver ID {receiver_id} does not exist")
+    claim = {"Food_ID": food_id, "Receiver_ID": receiver_id,
+             "Status": status, "Timestamp": pd.Timestamp(timestamp or datetime.now()).strftime("%Y-%m-%d %H:%M:%S.%f")}
+    # Serialize ID allocation: SQLite holds its single write lock from the
+    # INSERT to commit; PostgreSQL needs a lock that conflicts with itself
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("LOCK TABLE claims IN SHARE ROW EXCLUSIVE MODE"))
+    conn.execute(text("""
+        INSERT INTO claims (Claim_ID, Food_ID, Receiver_ID, Status, Timestamp)
+        SELECT COALESCE(MAX(Claim_ID), 0) + 1, :Food_ID, :Receiver_ID, :Status, :Timestamp FROM claims
+    """), claim)
+    claim["Claim_ID"] = fetch_row(conn, "SELECT MAX(Claim_ID) AS Claim_ID FROM claims")["Claim_ID"]
+    claim_changed(conn, new=claim)
+    return claim["Claim_ID"]
+
+def write_claim(conn, claim_id, sql, params):
+    """Run `sql` against a claim only if its status is still the one read.
+
+    Returns the (old row, new status) that was written, or None if the claim
+    does not exist. A concurrent writer that changed the claim in between
+    makes the conditional write match no row, and the claim is read again,
+    so leaderboard deltas are only applied by the session that made the
+    change.
+    """
+    for _ in range(CLAIM_WRITE_ATTEMPTS):
+        old = fetch_row(conn, "SELECT Claim_ID, Food_ID, Receiver_ID, Status, Timestamp FROM claims WHERE Claim_ID = :cid",
+                        {"cid": claim_id})
+        if old is None:
+            return None
+        result = conn.execute(text(sql + " WHERE Claim_ID = :cid AND Status = :old_status"),
+                              {**params, "cid": claim_id, "old_status": old["Status"]})
+        if result.rowcount == 1:
+            return old
+    raise RuntimeError(f"Claim {claim_id} kept changing while being written")
+
+def update_claim_status(conn, claim_id, status):
+    """Change a claim's status and move its leaderboard counts."""
+    old = write_claim(conn, claim_id, "UPDATE claims SET Status = :status", {"status": status})
+    if old is None:
+        return False
+    claim_changed(conn, old, {**old, "Status": status})
+    return True
+
+def delete_claim(conn, claim_id):
+    """Delete a claim and remove it from the leaderboards."""
+    old = write_claim(conn, claim_id, "DELETE FROM claims", {})
+    if old is None:
+        return False
+    claim_changed(conn, old=old)
+    return True
+
+# =========================
+# READS
+# =========================
+def top_k(conn, board, window="all", k=10, city=None):
+    """Top `k` entities of a leaderboard, optionally for one city."""
+    sql = """
+        SELECT Entity_ID, Name, City, Score
+        FROM leaderboard
+        WHERE Board = :board AND Time_Window = :window AND Score > 0
+    """
+    params = {"board": board, "window": window, "k": int(k)}
+    if city:
+        sql += " AND City = :city"
+        params["city"] = city
+    sql += " ORDER BY Score DESC, Entity_ID LIMIT :k"
+    return read_sql(conn, sql, params)
@@ -0,0 +1,237 @@
+# PROJECT NAME - Local Food Wastage Management System.
+# MODULE - Snapshot Read Replicas
+
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from contextlib import closing
+from sqlalchemy import create_engine
+
+DB_PATH = "Food Wastage.db"
+SNAPSHOT_DIR = "snapshots"
+
+Snapshot = namedtuple("Snapshot", ["version", "path", "published_at"])
+
+def connect_snapshot(snapshot):
+    """Open a read-only connection to an immutable snapshot file."""
+    uri = f"file:{os.path.abspath(snapshot.path)}?mode=ro&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+def snapshot_engine(snapshot):
+    """SQLAlchemy engine reading from a pinned snapshot."""
+    return create_engine("sqlite://", creator=lambda: connect_snapshot(snapshot))
+
+class ReplicaManager:
+    """Publishes versioned, read-only copies of the live database.
+
+    Writers keep using the live file; readers pin the newest snapshot for as
+    long as they need a consistent view. Each snapshot is written to a
+    temporary file and renamed into place, so a published snapshot never
+    changes afterwards. Pins are recorded as lease files next to the
+    snapshot, so garbage collection in any process leaves them alone.
+    """
+
+    def __init__(self, db_path=DB_PATH, snapshot_dir=SNAPSHOT_DIR, keep=3, grace_seconds=300, method="backup",
+                 lease_seconds=3600):
+        self.db_path = db_path
+        self.snapshot_dir = snapshot_dir
+        self.keep = keep
+        self.grace_seconds = grace_seconds
+        self.method = method
+        self.lease_seconds = lease_seconds
+        self.last_publish_seconds = None
+        self._lock = threading.Lock()
+        self._pin_lock = threading.Lock()
+        self._pins = {}
+        self._stop = threading.Event()
+        self._stale = threading.Event()
+        self._thread = None
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+    # =========================
+    # PUBLISHING
+    # =========================
+    def publish(self):
+        """Copy the live database into a new snapshot and return it."""
+        with self._lock:
+            start = time.perf_counter()
+            version = time.time_ns()
+            path = os.path.join(self.snapshot_dir, f"snapshot-{version:020d}.db")
+            tmp_path = path + ".tmp"
+            with closing(sqlite3.connect(self.db_path)) as source:
+                if self.method == "vacuum":
+                    source.execute("VACUUM INTO ?", (tmp_path,))
+                else:
+                    with closing(sqlite3.connect(tmp_path)) as target:
+                        source.backup(target)
+            os.replace(tmp_path, path)
+            self.last_publish_seconds = time.perf_counter() - start
+            self.collect_garbage()
+            return Snapshot(version, path, version / 1e9)
+
+    def snapshots(self):
+        """All published snapshots, oldest first."""
+        found = []
+        for name in sorted(os.listdir(self.snapshot_dir)):
+            if name.startswith("snapshot-") and name.endswith(".db"):
+                version = int(name[len("snapshot-"):-len(".db")])
+                found.append(Snapshot(version, os.path.join(self.snapshot_dir, name), version / 1e9))
+        return found
+
+    def latest(self):
+        """Newest snapshot, publishing one first if none exists yet."""
+        found = self.snapshots()
+        return found[-1] if found else self.publish()
+
+    # =========================
+    # PINNING
+    # =========================
+    def lease_path(self, snapshot):
+        """Lease file marking `snapshot` as pinned by this process."""
+        return f"{snapshot.path}.{os.getpid()}.lease"
+
+    def pin(self, snapshot=None):
+        """Pin `snapshot` (default: the newest) so it is not garbage collected."""
+        while True:
+            target = snapshot or self.latest()
+            with self._pin_lock:
+                self._pins[target.path] = self._pins.get(target.path, 0) + 1
+                # Create or renew this process's lease
+                with open(self.lease_path(target), "a"):
+                    os.utime(self.lease_path(target))
+            if os.path.exists(target.path):
+                return target
+            # Collected between latest() and the lease being written
+            self.unpin(target)
+            if snapshot is not None:
+                raise FileNotFoundError(target.path)
+
+    def unpin(self, snapshot):
+        """Release one pin; the lease is removed once this process holds none."""
+        with self._pin_lock:
+            count = self._pins.get(snapshot.path, 0) - 1
+            if count > 0:
+                self._pins[snapshot.path] = count
+                return
+            self._pins.pop(snapshot.path, None)
+            try:
+                os.remove(self.lease_path(snapshot))
+            except OSError:
+                pass
+
+    def leases(self, snapshot):
+        """Lease files on `snapshot` from any process, with their age in seconds."""
+        prefix = os.path.basename(snapshot.path) + "."
+        now = time.time()
+        found = {}
+        for name in os.listdir(self.snapshot_dir):
+            if name.startswith(prefix) and name.endswith(".lease"):
+                path = os.path.join(self.snapshot_dir, name)
+                try:
+                    found[path] = now - os.path.getmtime(path)
+                except OSError:
+                    pass
+        return found
+
+    def collect_garbage(self):
+        """Delete old unpinned snapshots, keeping the newest `keep` and any still in their grace period.
+
+        Leases older than `lease_seconds` and half-written `.tmp` copies older
+        than the grace period are treated as left behind by a crashed process.
+        Files that can't be removed yet (e.g. still open on Windows) are
+        retried on the next run.
+        """
+        now = time.time()
+        for name in os.listdir(self.snapshot_dir):
+            path = os.path.join(self.snapshot_dir, name)
+            try:
+                if name.endswith(".db.tmp") and now - os.path.getmtime(path) > self.grace_seconds:
+                    os.remove(path)
+            except OSError:
+                pass
+        for snapshot in self.snapshots()[:-self.keep]:
+            if now - snapshot.published_at <= self.grace_seconds:
+                continue
+            leases = self.leases(snapshot)
+            if any(age <= self.lease_seconds for age in leases.values()):
+                continue
+            try:
+                os.remove(snapshot.path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️ Could not remove {snapshot.path}: {e}")
+                continue
+            for path in leases:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # =========================
+    # SCHEDULING
+    # =========================
+    def maybe_publish(self, max_lag_seconds):
+        """Publish a new snapshot if the replica lag exceeds `max_lag_seconds`."""
+        if self.lag_seconds() > max_lag_seconds or not self.snapshots():
+            return self.publish()
+        return self.latest()
+
+    def mark_stale(self):
+        """Ask the background publisher to publish now instead of at its next interval."""
+        self._stale.set()
+
+    def start(self, interval_seconds=60):
+        """Publish a snapshot every `interval_seconds`, or sooner after mark_stale, on a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while True:
+                self._stale.wait(interval_seconds)
+                self._stale.clear()
+                if self._stop.is_set():
+                    break
+                try:
+                    self.maybe_publish(0)
+                except (sqlite3.Error, OSError) as e:
+                    print(f"❌ Snapshot publish failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="replica-publisher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background publisher."""
+        self._stop.set()
+        self._stale.set()
+
+    # =========================
+    # METRICS
+    # =========================
+    def last_write_time(self):
+        """Latest modification time of the live database or its WAL file."""
+        times = [os.path.getmtime(p) for p in (self.db_path, self.db_path + "-wal") if os.path.exists(p)]
+        return max(times, default=0.0)
+
+    def lag_seconds(self):
+        """Age of the newest snapshot if the live database changed after it, else 0."""
+        found = self.snapshots()
+        if not found:
+            return float("inf")
+        published_at = found[-1].published_at
+        if self.last_write_time() <= published_at:
+            return 0.0
+        return time.time() - published_at
+
+    def metrics(self):
+        """Replica health numbers for the dashboard."""
+        found = self.snapshots()
+        return {
+            "Snapshot_Version": found[-1].version if found else None,
+            "Snapshots": len(found),
+            "Replica_Lag_Seconds": round(self.lag_seconds(), 2),
+            "Last_Publish_Seconds": self.last_publish_seconds,
+        }
@@ -0,0 +1,267 @@
+# PROJECT NAME - Local Food Wastage Management System.
+# MODULE - Storage Backend (SQLite / PostgreSQL)
+
+import io
+import os
+import re
+import threading
+import time
+import pandas as pd
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from replicas import snapshot_engine
+
+DB_URL = os.environ.get("FOOD_WASTAGE_DB_URL", "sqlite:///Food Wastage.db")
+PARALLEL_WORKERS = int(os.environ.get("FOOD_WASTAGE_PARALLEL_WORKERS", "4"))
+
+# PostgreSQL folds unquoted identifiers to lower case, so tables are created
+# with lower-case columns there and result columns are mapped back to the
+# names used throughout the project.
+COLUMN_NAMES = [
+    "Provider_ID", "Name", "Type", "Address", "City", "Contact",
+    "Receiver_ID",
+    "Food_ID", "Food_Name", "Quantity", "Expiry_Date", "Provider_Type", "Location", "Food_Type", "Meal_Type",
+    "Claim_ID", "Status", "Timestamp",
+]
+
+_engines = {}
+
+# =========================
+# ENGINES
+# =========================
+def get_engine(url=DB_URL):
+    """Pooled engine for `url`, created once per process."""
+    if url not in _engines:
+        if url.startswith("sqlite"):
+            engine = create_engine(url, connect_args={"check_same_thread": False, "timeout": 30})
+
+            @event.listens_for(engine, "connect")
+            def configure_sqlite(dbapi_conn, record):
+                # WAL lets readers run alongside the single writer
+                dbapi_conn.execute("PRAGMA journal_mode=WAL")
+                dbapi_conn.execute("PRAGMA busy_timeout=30000")
+        else:
+            # Let PostgreSQL split large scans and aggregates across workers
+            engine = create_engine(
+                url, pool_size=5, max_overflow=10, pool_pre_ping=True,
+                connect_args={"options": f"-c max_parallel_workers_per_gather={PARALLEL_WORKERS}"},
+            )
+        _engines[url] = engine
+    return _engines[url]
+
+def is_postgres(engine):
+    """True when `engine` targets PostgreSQL."""
+    return engine.dialect.name == "postgresql"
+
+def sqlite_path(engine):
+    """Database file behind a SQLite engine, or None for other backends."""
+    return engine.url.database if engine.dialect.name == "sqlite" else None
+
+# =========================
+# READS & WRITES
+# =========================
+def canonical_names(sql=""):
+    """Lower-case name -> project spelling, for known columns and words in `sql`.
+
+    Aliases (`AS Name`) win over other words, so a column aliased `Providers`
+    keeps that spelling even though the table `providers` is also in `sql`.
+    """
+    names = {name.lower(): name for name in COLUMN_NAMES}
+    # Bind parameters such as :city are not column names
+    names.update({word.lower(): word for word in re.findall(r"(?<![:\w])[A-Za-z_][A-Za-z0-9_]*", sql)})
+    names.update({alias.lower(): alias for alias in re.findall(r"\bAS\s+([A-Za-z_][A-Za-z0-9_]*)", sql, re.IGNORECASE)})
+    return names
+
+def restore_column_case(df, sql):
+    """Map lower-cased PostgreSQL result columns back to their original names."""
+    names = canonical_names(sql)
+    return df.rename(columns=lambda column: names.get(column, column))
+
+def read_sql(conn, sql, params=None):
+    """Run a SELECT on a connection or engine and return a DataFrame."""
+    df = pd.read_sql(text(sql), conn, params=params or {})
+    return restore_column_case(df, sql) if conn.dialect.name == "postgresql" else df
+
+def fetch_row(conn, sql, params=None):
+    """First result row as a dict keyed by project column names, or None."""
+    row = conn.execute(text(sql), params or {}).mappings().first()
+    if row is None:
+        return None
+    names = canonical_names(sql)
+    return {names.get(key, key): value for key, value in row.items()}
+
+def execute(engine, sql, params=None):
+    """Run a write statement in its own transaction."""
+    with engine.begin() as conn:
+        conn.execute(text(sql), params or {})
+
+def table_columns(conn, table_name):
+    """Column names of `table_name`, or an empty list if it does not exist."""
+    inspector = inspect(conn)
+    if not inspector.has_table(table_name):
+        return []
+    names = canonical_names()
+    return [names.get(column["name"], column["name"]) for column in inspector.get_columns(table_name)]
+
+def bulk_load(engine, df, table_name, if_exists="append"):
+    """Load a DataFrame, using COPY on PostgreSQL and batched inserts on SQLite."""
+    if not is_postgres(engine):
+        df.to_sql(table_name, con=engine, if_exists=if_exists, index=False, chunksize=10_000)
+        return
+    df = df.rename(columns=str.lower)
+    if if_exists == "replace":
+        # Materialized insight views depend on the base tables
+        execute(engine, f"DROP TABLE IF EXISTS {table_name} CASCADE")
+    # Create the table from the frame's schema, then stream the rows
+    df.head(0).to_sql(table_name, con=engine, if_exists="append", index=False)
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    copy_sql = f"COPY {table_name} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)"
+    raw_conn = engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cursor:
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(copy_sql, buffer)
+            else:
+                with cursor.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
+
+# =========================
+# INSIGHT QUERIES
+# =========================
+def insight_view_name(title):
+    """Materialized view name for an insight title."""
+    return "insight_" + re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_")
+
+def has_params(sql):
+    """True if `sql` has bind parameters such as :city."""
+    return bool(text(sql).compile().params)
+
+def view_exists(conn, view):
+    """True if the materialized view `view` exists."""
+    return conn.execute(text("SELECT 1 FROM pg_matviews WHERE matviewname = :view"), {"view": view}).first() is not None
+
+def refresh_insights(engine, queries):
+    """Materialize parameterless insight queries on PostgreSQL (no-op on SQLite).
+
+    Missing views are created; existing ones are refreshed CONCURRENTLY, one
+    transaction per view, so readers are never blocked. Every view gets an
+    `insight_row` column with a unique index, which the concurrent refresh
+    requires, and which keeps the query's row order.
+    """
+    if not is_postgres(engine):
+        return
+    for title, sql in queries.items():
+        if sql and not has_params(sql):
+            view = insight_view_name(title)
+            with engine.begin() as conn:
+                if view_exists(conn, view):
+                    conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+                else:
+                    conn.execute(text(
+                        f"CREATE MATERIALIZED VIEW {view} AS "
+                        f"SELECT ROW_NUMBER() OVER () AS insight_row, q.* FROM ({sql.strip().rstrip(';')}) q"
+                    ))
+                    conn.execute(text(f"CREATE UNIQUE INDEX {view}_row ON {view} (insight_row)"))
+
+def read_insight(conn, title, sql, params=None):
+    """Read an insight from its materialized view on PostgreSQL, else run it.
+
+    Falls back to the query itself while the view is missing, e.g. after a
+    reload dropped it with its base table.
+    """
+    view = insight_view_name(title)
+    if conn.dialect.name == "postgresql" and not has_params(sql) and view_exists(conn, view):
+        view_df = pd.read_sql(text(f"SELECT * FROM {view} ORDER BY insight_row"), conn)
+        return restore_column_case(view_df.drop(columns="insight_row"), sql)
+    return read_sql(conn, sql, params)
+
+class InsightRefresher:
+    """Refreshes the insight views on a background thread.
+
+    Writers call mark_stale() and return immediately; the thread refreshes
+    every `interval_seconds` while there are unrefreshed writes, so a burst
+    of writes costs one refresh.
+    """
+
+    def __init__(self, engine, queries):
+        self.engine = engine
+        self.queries = queries
+        self.last_refresh_seconds = None
+        self._stale = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def mark_stale(self):
+        self._stale.set()
+
+    def refresh(self):
+        start = time.perf_counter()
+        refresh_insights(self.engine, self.queries)
+        self.last_refresh_seconds = time.perf_counter() - start
+
+    def start(self, interval_seconds=30):
+        """Refresh stale views every `interval_seconds` on a background thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval_seconds):
+                if not self._stale.is_set():
+                    continue
+                self._stale.clear()
+                try:
+                    self.refresh()
+                except SQLAlchemyError as e:
+                    self._stale.set()
+                    print(f"❌ Insight refresh failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="insight-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._stop.set()
+
+# =========================
+# CONSISTENT READERS
+# =========================
+class PinnedReader:
+    """Read-only view that stays consistent across many queries.
+
+    On SQLite it reads from a pinned replica snapshot; on PostgreSQL it holds
+    one REPEATABLE READ transaction open, so every query sees the same data.
+    """
+
+    def __init__(self, engine, replica_manager=None):
+        self.replica_manager = replica_manager
+        self.snapshot = None
+        self.snapshot_engine = None
+        if is_postgres(engine):
+            self.conn = engine.connect().execution_options(isolation_level="REPEATABLE READ")
+            self.conn.begin()
+            self.conn.execute(text("SET TRANSACTION READ ONLY"))
+        else:
+            self.snapshot = replica_manager.pin()
+            self.snapshot_engine = snapshot_engine(self.snapshot)
+            self.conn = self.snapshot_engine.connect()
+
+    def read_sql(self, sql, params=None):
+        return read_sql(self.conn, sql, params)
+
+    def read_insight(self, title, sql, params=None):
+        return read_insight(self.conn, title, sql, params)
+
+    def table_columns(self, table_name):
+        return table_columns(self.conn, table_name)
+
+    def close(self):
+        self.conn.close()
+        if self.snapshot_engine is not None:
+            self.snapshot_engine.dispose()
+            self.replica_manager.unpin(self.snapshot)
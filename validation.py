@@ -0,0 +1,320 @@
+# PROJECT NAME - Local Food Wastage Management System.
+# MODULE - Data-Quality Validation
+
+import time
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from storage import bulk_load, read_sql, table_columns
+
+# =========================
+# TABLE SPECIFICATIONS
+# =========================
+# Tables are validated parents-first so child rows can be checked against
+# the keys that were actually accepted. `value` is an extra column kept per
+# key for cross-table checks.
+TABLE_SPECS = {
+    "providers": {"key": "Provider_ID", "value": "Type", "parents": [], "integers": ["Provider_ID"], "dates": []},
+    "receivers": {"key": "Receiver_ID", "value": None, "parents": [], "integers": ["Receiver_ID"], "dates": []},
+    "food_listings": {"key": "Food_ID", "value": None, "parents": ["providers"],
+                      "integers": ["Food_ID", "Quantity", "Provider_ID"], "dates": ["Expiry_Date"]},
+    "claims": {"key": "Claim_ID", "value": None, "parents": ["food_listings", "receivers"],
+               "integers": ["Claim_ID", "Food_ID", "Receiver_ID"], "dates": ["Timestamp"]},
+}
+
+class KeyIndex:
+    """Accepted IDs of one table, with an optional value per ID.
+
+    Dense IDs are kept in a bitmap indexed by ID, so lookups and inserts are
+    vectorized O(1) per row. Once the IDs get sparse (the largest ID is far
+    above the number of keys) the index switches to sorted runs searched
+    with np.searchsorted, so memory stays proportional to the row count.
+    Runs are merged like a binary counter: each ID is re-merged O(log N)
+    times and there are never more than O(log N) runs to search.
+    """
+
+    DENSE_FACTOR = 4
+    DENSE_MIN = 1 << 16
+
+    def __init__(self, with_values=False):
+        self.count = 0
+        self.with_values = with_values
+        self.present = np.zeros(0, dtype=bool)
+        self.values = np.empty(0, dtype=object) if with_values else None
+        self.runs = None
+
+    def _fits_bitmap(self, ids):
+        limit = max(self.DENSE_FACTOR * (self.count + len(ids)), self.DENSE_MIN)
+        return ids.min() >= 0 and ids.max() < limit
+
+    def _grow(self, max_id):
+        if max_id >= len(self.present):
+            size = max(int(max_id) + 1, 2 * len(self.present))
+            self.present = np.concatenate([self.present, np.zeros(size - len(self.present), dtype=bool)])
+            if self.values is not None:
+                self.values = np.concatenate([self.values, np.empty(size - len(self.values), dtype=object)])
+
+    def _to_runs(self):
+        ids = np.flatnonzero(self.present)
+        self.runs = [(ids, self.values[ids] if self.with_values else None)]
+        self.present = self.values = None
+
+    def _add_run(self, ids, values):
+        self.runs.append((ids, values))
+        # Merge while the newest run is at least as large as the one before it
+        while len(self.runs) > 1 and len(self.runs[-1][0]) >= len(self.runs[-2][0]):
+            (ids_b, values_b), (ids_a, values_a) = self.runs.pop(), self.runs.pop()
+            merged = np.concatenate([ids_a, ids_b])
+            if self.with_values:
+                order = np.argsort(merged, kind="stable")
+                self.runs.append((merged[order], np.concatenate([values_a, values_b])[order]))
+            else:
+                # Two sorted runs: timsort merges them in linear time
+                self.runs.append((np.sort(merged, kind="stable"), None))
+
+    def add(self, ids, values=None):
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+        if self.present is not None and not self._fits_bitmap(ids):
+            self._to_runs()
+        if self.present is not None:
+            self._grow(ids.max())
+            self.present[ids] = True
+            if self.values is not None:
+                self.values[ids] = np.asarray(values, dtype=object)
+        else:
+            # IDs already present keep their value
+            new_ids, first = np.unique(ids, return_index=True)
+            fresh = ~self.contains(new_ids)
+            new_values = np.asarray(values, dtype=object)[first][fresh] if self.with_values else None
+            if fresh.any():
+                self._add_run(new_ids[fresh], new_values)
+        self.count += len(ids)
+
+    def _matches(self, ids):
+        """Yield (slot array or run, positions, found mask) for every place `ids` may be stored."""
+        ids = pd.to_numeric(pd.Series(ids), errors="coerce").to_numpy(dtype=float)
+        valid = ~np.isnan(ids) & (ids % 1 == 0)
+        int_ids = np.zeros(len(ids), dtype=np.int64)
+        int_ids[valid] = ids[valid].astype(np.int64)
+        if self.present is not None:
+            found = valid & (int_ids >= 0) & (int_ids < len(self.present))
+            found[found] = self.present[int_ids[found]]
+            yield self.values, int_ids, found
+            return
+        # Probing in sorted order keeps the binary searches cache-friendly
+        order = np.argsort(int_ids)
+        sorted_ids = int_ids[order]
+        for run_ids, run_values in self.runs:
+            positions = np.empty(len(int_ids), dtype=np.int64)
+            positions[order] = np.searchsorted(run_ids, sorted_ids)
+            found = valid & (positions < len(run_ids))
+            found[found] = run_ids[positions[found]] == int_ids[found]
+            yield run_values, positions, found
+
+    def contains(self, ids):
+        found = np.zeros(len(ids), dtype=bool)
+        for _, _, run_found in self._matches(ids):
+            found |= run_found
+        return found
+
+    def lookup(self, ids):
+        result = np.empty(len(ids), dtype=object)
+        for values, positions, found in self._matches(ids):
+            result[found] = values[positions[found]]
+        return result
+
+# =========================
+# RULES
+# =========================
+# Every rule takes a chunk plus the accepted key indexes and returns a
+# boolean mask of violating rows.
+def invalid_integer(column, allow_negative=False):
+    def check(chunk, keys):
+        values = pd.to_numeric(chunk[column], errors="coerce")
+        invalid = values.isna() | (values % 1 != 0)
+        if not allow_negative:
+            invalid |= values < 0
+        return invalid.to_numpy()
+    return check
+
+def duplicate_key(table):
+    def check(chunk, keys):
+        ids = pd.to_numeric(chunk[TABLE_SPECS[table]["key"]], errors="coerce")
+        return (ids.duplicated() & ids.notna()).to_numpy() | keys[table].contains(ids)
+    return check
+
+def negative_quantity(chunk, keys):
+    return (pd.to_numeric(chunk["Quantity"], errors="coerce") < 0).to_numpy()
+
+def unparseable_date(column):
+    def check(chunk, keys):
+        parsed = pd.to_datetime(chunk[column], errors="coerce", format="mixed")
+        return (chunk[column].notna() & parsed.isna()).to_numpy()
+    return check
+
+def orphan_reference(column, parent):
+    def check(chunk, keys):
+        return ~keys[parent].contains(chunk[column])
+    return check
+
+def provider_type_mismatch(chunk, keys):
+    provider_type = keys["providers"].lookup(chunk["Provider_ID"])
+    return (provider_type != None) & (provider_type != chunk["Provider_Type"].to_numpy())  # noqa: E711
+
+RULES = {
+    "providers": {
+        "invalid_provider_id": invalid_integer("Provider_ID"),
+        "duplicate_provider_id": duplicate_key("providers"),
+    },
+    "receivers": {
+        "invalid_receiver_id": invalid_integer("Receiver_ID"),
+        "duplicate_receiver_id": duplicate_key("receivers"),
+    },
+    "food_listings": {
+        "invalid_food_id": invalid_integer("Food_ID"),
+        "duplicate_food_id": duplicate_key("food_listings"),
+        "invalid_quantity": invalid_integer("Quantity", allow_negative=True),
+        "negative_quantity": negative_quantity,
+        "unparseable_expiry_date": unparseable_date("Expiry_Date"),
+        "orphan_provider_id": orphan_reference("Provider_ID", "providers"),
+        "provider_type_mismatch": provider_type_mismatch,
+    },
+    "claims": {
+        "invalid_claim_id": invalid_integer("Claim_ID"),
+        "duplicate_claim_id": duplicate_key("claims"),
+        "unparseable_timestamp": unparseable_date("Timestamp"),
+        "orphan_food_id": orphan_reference("Food_ID", "food_listings"),
+        "orphan_receiver_id": orphan_reference("Receiver_ID", "receivers"),
+    },
+}
+
+# =========================
+# VALIDATION
+# =========================
+def iter_chunks(source, chunksize):
+    """Yield chunks from a CSV path or an in-memory DataFrame."""
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+    else:
+        yield from pd.read_csv(source, dtype=str, chunksize=chunksize)
+
+def validate_chunk(table, chunk, keys, timings):
+    """Run every rule for `table` and return a (rows x rules) violation frame."""
+    masks = {}
+    for rule_name, check in RULES[table].items():
+        start = time.perf_counter()
+        masks[rule_name] = check(chunk, keys)
+        timings[(table, rule_name)] += time.perf_counter() - start
+    return pd.DataFrame(masks, index=chunk.index)
+
+def clean_chunk(table, chunk):
+    """Cast accepted rows to the column types stored in the database."""
+    chunk = chunk.copy()
+    for column in TABLE_SPECS[table]["integers"]:
+        chunk[column] = pd.to_numeric(chunk[column]).astype("int64")
+    for column in TABLE_SPECS[table]["dates"]:
+        chunk[column] = pd.to_datetime(chunk[column], errors="coerce", format="mixed")
+    return chunk
+
+def load_stored_keys(engine, table, key_index):
+    """Fill `key_index` with the keys of `table` already in the database."""
+    spec = TABLE_SPECS[table]
+    with engine.connect() as conn:
+        if not table_columns(conn, table):
+            raise ValueError(f"'{table}' is neither in sources nor in the database, so its child rows can't be validated")
+        columns = [spec["key"]] + ([spec["value"]] if spec["value"] else [])
+        stored = read_sql(conn, f"SELECT {', '.join(columns)} FROM {table}")
+    stored = stored.dropna(subset=[spec["key"]])
+    key_index.add(stored[spec["key"]], stored[spec["value"]] if spec["value"] else None)
+
+def ingest_with_validation(engine, sources, chunksize=100_000):
+    """Validate each table chunk by chunk and load it into the database.
+
+    `sources` maps table name to a CSV path or DataFrame. Rows that break a
+    rule go to `quarantine_<table>` with the broken rules listed in the
+    `Violations` column; the returned report has one row per rule with its
+    violation count and time spent. Parents of a loaded table that are not in
+    `sources` are checked against the keys already stored in the database.
+    """
+    keys = {table: KeyIndex(with_values=spec["value"] is not None) for table, spec in TABLE_SPECS.items()}
+    for table in {parent for table in sources for parent in TABLE_SPECS[table]["parents"]} - set(sources):
+        load_stored_keys(engine, table, keys[table])
+    timings = defaultdict(float)
+    violations = defaultdict(int)
+    row_counts = {}
+    with engine.begin() as conn:
+        for table in sources:
+            conn.execute(text(f"DROP TABLE IF EXISTS quarantine_{table}"))
+
+    for table, spec in TABLE_SPECS.items():
+        if table not in sources:
+            continue
+        accepted = quarantined = 0
+        if_exists = "replace"
+        for chunk in iter_chunks(sources[table], chunksize):
+            masks = validate_chunk(table, chunk, keys, timings)
+            for rule_name, count in masks.sum().items():
+                violations[(table, rule_name)] += int(count)
+            bad = masks.any(axis=1).to_numpy()
+
+            good_rows = clean_chunk(table, chunk[~bad])
+            bulk_load(engine, good_rows, table, if_exists=if_exists)
+            if_exists = "append"
+            keys[table].add(good_rows[spec["key"]], good_rows[spec["value"]] if spec["value"] else None)
+
+            if bad.any():
+                bad_rows = chunk[bad].copy()
+                bad_masks = masks[bad]
+                bad_rows["Violations"] = bad_masks.dot(bad_masks.columns + ";").str.rstrip(";")
+                bulk_load(engine, bad_rows, f"quarantine_{table}")
+            accepted += int((~bad).sum())
+            quarantined += int(bad.sum())
+        row_counts[table] = (accepted, quarantined)
+
+    report = pd.DataFrame(
+        [(table, rule_name, violations[(table, rule_name)], round(timings[(table, rule_name)], 4))
+         for table in TABLE_SPECS if table in sources for rule_name in RULES[table]],
+        columns=["Table", "Rule", "Violations", "Seconds"],
+    )
+    return report, row_counts
+
+# =========================
+# DATABASE AUDIT
+# =========================
+# Set-based anti-joins for data already in the database.
+AUDIT_QUERIES = {
+    "orphan_food_id": """
+        SELECT COUNT(*) FROM claims c
+        WHERE NOT EXISTS (SELECT 1 FROM food_listings f WHERE f.Food_ID = c.Food_ID)
+    """,
+    "orphan_receiver_id": """
+        SELECT COUNT(*) FROM claims c
+        WHERE NOT EXISTS (SELECT 1 FROM receivers r WHERE r.Receiver_ID = c.Receiver_ID)
+    """,
+    "orphan_provider_id": """
+        SELECT COUNT(*) FROM food_listings f
+        WHERE NOT EXISTS (SELECT 1 FROM providers p WHERE p.Provider_ID = f.Provider_ID)
+    """,
+    "negative_quantity": """
+        SELECT COUNT(*) FROM food_listings WHERE Quantity < 0
+    """,
+    "provider_type_mismatch": """
+        SELECT COUNT(*) FROM food_listings f
+        WHERE EXISTS (SELECT 1 FROM providers p
+                      WHERE p.Provider_ID = f.Provider_ID AND p.Type <> f.Provider_Type)
+    """,
+}
+
+def audit_database(engine):
+    """Count rule violations already stored in the database."""
+    rows = []
+    with engine.connect() as conn:
+        for rule_name, sql in AUDIT_QUERIES.items():
+            start = time.perf_counter()
+            count = conn.execute(text(sql)).scalar()
+            rows.append((rule_name, count, round(time.perf_counter() - start, 4)))
+    return pd.DataFrame(rows, columns=["Rule", "Violations", "Seconds"])